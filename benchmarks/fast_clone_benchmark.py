@@ -0,0 +1,191 @@
+"""
+快速构建路径（fast_clone）的等价性校验与性能基准
+
+脚本自行生成模板和图片，结果可复现：
+  1. 生成带有两张已有幻灯片、且部件名不连续（slide1.xml、slide3.xml）的模板
+  2. 分别使用标准路径和快速路径生成相同内容，逐个比较 zip 成员，并检查成员名无重复
+  3. 记录两条路径生成大量幻灯片（默认快速路径 10000 张）的构建和保存耗时
+
+用法：
+    python benchmarks/fast_clone_benchmark.py
+    python benchmarks/fast_clone_benchmark.py --slides 10000 --standard-slides 10000
+"""
+import argparse
+import contextlib
+import io
+import logging
+import os
+import sys
+import tempfile
+import time
+import zipfile
+from pptx import Presentation
+from PIL import Image
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.content_populator import ContentPopulator
+
+# python-pptx 默认模板中带图片占位符和正文占位符的布局
+PICTURE_LAYOUT = 'Picture with Caption'
+TEXT_LAYOUT = 'Section Header'
+
+
+def create_template(path: str):
+    """
+    创建带有已有幻灯片的模板，删除中间一张使部件名不连续
+
+    Args:
+        path: 模板输出路径
+    """
+    prs = Presentation()
+    for i in range(3):
+        slide = prs.slides.add_slide(prs.slide_layouts[1])
+        slide.shapes.title.text = f"模板幻灯片 {i + 1}"
+
+    # 直接删除第二张幻灯片且不再访问 prs.slides，保存后部件名为 slide1.xml、slide3.xml
+    sldIdLst = prs.part._element.sldIdLst
+    sldId = sldIdLst.sldId_lst[1]
+    prs.part.drop_rel(sldId.rId)
+    sldIdLst.remove(sldId)
+    prs.save(path)
+
+    with zipfile.ZipFile(path) as zf:
+        slide_names = sorted(n for n in zf.namelist() if n.startswith('ppt/slides/slide'))
+    logging.info(f"模板已有幻灯片部件: {slide_names}")
+
+
+def create_images(image_dir: str) -> list:
+    """
+    生成不同宽高比的测试图片
+
+    Args:
+        image_dir: 图片目录
+
+    Returns:
+        list: [(图片路径, (宽, 高)), ...]
+    """
+    images = []
+    for k, size in enumerate([(800, 600), (600, 800), (1200, 400), (500, 500)]):
+        path = os.path.join(image_dir, f"image_{k}.png")
+        Image.new('RGB', size, (40 * k, 80, 160)).save(path)
+        images.append((path, size))
+    return images
+
+
+def build(template_path: str, output_path: str, images: list, slide_count: int, fast_clone: bool) -> tuple:
+    """
+    生成指定数量的幻灯片并保存
+
+    Args:
+        template_path: 模板路径
+        output_path: 输出路径
+        images: 测试图片列表
+        slide_count: 幻灯片数量
+        fast_clone: 是否使用快速构建路径
+
+    Returns:
+        tuple: (构建耗时, 保存耗时)，单位为秒
+    """
+    populator = ContentPopulator(template_path, fast_clone=fast_clone)
+    start = time.perf_counter()
+    # 标准路径的图片填充会输出大量调试信息，计时时屏蔽
+    with contextlib.redirect_stdout(io.StringIO()):
+        for i in range(slide_count):
+            if i % 3 == 2:
+                slide, _ = populator.add_slide(TEXT_LAYOUT, title=f"文本 {i}")
+                populator.fill_text(slide, 0, f"第一行 {i}\n第二行")
+            else:
+                slide, _ = populator.add_slide(PICTURE_LAYOUT, title=f"图片 {i}")
+                image_path, image_size = images[i % len(images)]
+                populator.fill_image(slide, 0, image_path, image_size)
+                populator.fill_text(slide, 0, f"说明 {i}")
+    built = time.perf_counter()
+    populator.save(output_path)
+    saved = time.perf_counter()
+    return built - start, saved - built
+
+
+def read_members(path: str) -> dict:
+    """
+    读取 zip 中的全部成员，成员名重复时报错
+
+    Args:
+        path: PPT文件路径
+
+    Returns:
+        dict: 成员名到内容的映射
+    """
+    with zipfile.ZipFile(path) as zf:
+        names = zf.namelist()
+        duplicates = sorted({n for n in names if names.count(n) > 1})
+        if duplicates:
+            raise ValueError(f"{path} 中存在重复的 zip 成员: {duplicates}")
+        return {name: zf.read(name) for name in names}
+
+
+def check_equivalence(template_path: str, work_dir: str, images: list, slide_count: int) -> bool:
+    """
+    比较标准路径与快速路径的输出是否逐字节一致
+
+    Returns:
+        bool: 一致时返回 True
+    """
+    outputs = {}
+    for fast_clone in (False, True):
+        output_path = os.path.join(work_dir, f"check_{'fast' if fast_clone else 'standard'}.pptx")
+        build(template_path, output_path, images, slide_count, fast_clone)
+        outputs[fast_clone] = read_members(output_path)
+
+    standard, fast = outputs[False], outputs[True]
+    differences = sorted(
+        name for name in set(standard) | set(fast)
+        if standard.get(name) != fast.get(name)
+    )
+    if differences:
+        logging.error(f"快速路径与标准路径的输出不一致，差异成员: {differences[:20]}")
+        return False
+    logging.info(f"等价性校验通过：{slide_count} 张幻灯片，{len(standard)} 个 zip 成员完全一致")
+    return True
+
+
+def main():
+    parser = argparse.ArgumentParser(description="快速构建路径的等价性校验与性能基准")
+    parser.add_argument('--check-slides', type=int, default=60, help="等价性校验生成的幻灯片数量")
+    parser.add_argument('--slides', type=int, default=10000, help="快速路径基准测试的幻灯片数量")
+    parser.add_argument('--standard-slides', type=int, default=1000,
+                        help="标准路径基准测试的幻灯片数量（标准路径随幻灯片数平方增长，10000 张约需数十分钟），0 表示跳过")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+    with tempfile.TemporaryDirectory() as work_dir:
+        template_path = os.path.join(work_dir, "template.pptx")
+        create_template(template_path)
+        images = create_images(work_dir)
+
+        # 基准测试期间只保留本脚本的日志
+        logging.getLogger().setLevel(logging.WARNING)
+        equivalent = check_equivalence(template_path, work_dir, images, args.check_slides)
+
+        results = []
+        for fast_clone, slide_count in ((True, args.slides), (False, args.standard_slides)):
+            if slide_count <= 0:
+                continue
+            output_path = os.path.join(work_dir, f"bench_{'fast' if fast_clone else 'standard'}.pptx")
+            build_time, save_time = build(template_path, output_path, images, slide_count, fast_clone)
+            read_members(output_path)
+            results.append((fast_clone, slide_count, build_time, save_time))
+
+    print(f"等价性校验: {'通过' if equivalent else '失败'}")
+    print(f"{'路径':<10}{'幻灯片':>8}{'构建(s)':>10}{'保存(s)':>10}{'每张(ms)':>10}")
+    for fast_clone, slide_count, build_time, save_time in results:
+        per_slide = (build_time + save_time) / slide_count * 1000
+        name = 'fast' if fast_clone else 'standard'
+        print(f"{name:<10}{slide_count:>8}{build_time:>10.2f}{save_time:>10.2f}{per_slide:>10.2f}")
+
+    return 0 if equivalent else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
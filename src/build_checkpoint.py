@@ -0,0 +1,267 @@
+from typing import Dict
+import json
+import logging
+import os
+import posixpath
+import shutil
+from pptx.media import Video
+from pptx.opc.constants import RELATIONSHIP_TYPE as RT
+from pptx.oxml import parse_xml
+from pptx.parts.image import ImagePart
+from pptx.parts.media import MediaPart
+from .pptx_internals import set_relationship
+
+
+class BuildCheckpoint:
+    """构建检查点，记录已完成的内容组及其媒体，使中断的构建可以从上次完成的组继续"""
+
+    STATE_FILE = 'checkpoint.json'
+    JOURNAL_FILE = 'journal.jsonl'
+
+    def __init__(self, work_dir: str, fingerprint: str):
+        """
+        初始化构建检查点
+
+        Args:
+            work_dir: 检查点工作目录
+            fingerprint: 当前构建指纹，与工作目录中记录的不一致时丢弃旧检查点
+        """
+        self.work_dir = work_dir
+        self.fingerprint = fingerprint
+        self.completed = {}
+        self._next_slide = 1
+        self._saved_parts = {}
+        self._restored_parts = {}
+        self._layout_parts = None
+
+    def _path(self, *names: str) -> str:
+        """返回工作目录下的文件路径"""
+        return os.path.join(self.work_dir, *names)
+
+    def _is_checkpoint_dir(self) -> bool:
+        """判断工作目录是否由检查点创建（包含状态文件）"""
+        return os.path.isfile(self._path(self.STATE_FILE))
+
+    def _remove_work_dir(self):
+        """
+        删除工作目录，只删除由检查点创建的目录
+
+        Raises:
+            ValueError: 工作目录已存在且不是检查点目录
+        """
+        if not os.path.exists(self.work_dir):
+            return
+        if self._is_checkpoint_dir():
+            shutil.rmtree(self.work_dir)
+        elif os.path.isdir(self.work_dir) and not os.listdir(self.work_dir):
+            os.rmdir(self.work_dir)
+        else:
+            raise ValueError(f"检查点工作目录已存在且不是检查点目录，拒绝删除: {self.work_dir}")
+
+    def open(self):
+        """
+        打开工作目录并加载日志，输入已变化的旧检查点会被自动清理
+
+        Raises:
+            ValueError: 工作目录已存在且不是检查点目录
+        """
+        try:
+            state = None
+            try:
+                with open(self._path(self.STATE_FILE), 'r', encoding='utf-8') as f:
+                    state = json.load(f)
+            except (OSError, ValueError):
+                pass
+
+            if state is None or state.get('fingerprint') != self.fingerprint:
+                if os.path.exists(self.work_dir):
+                    logging.info(f"输入已变化，清理过期的检查点: {self.work_dir}")
+                    self._remove_work_dir()
+                # 先写入状态文件标记目录归属，中断后仍可识别并清理该目录
+                os.makedirs(self.work_dir)
+                with open(self._path(self.STATE_FILE), 'w', encoding='utf-8') as f:
+                    json.dump({'fingerprint': self.fingerprint}, f)
+                os.makedirs(self._path('slides'))
+                os.makedirs(self._path('media'))
+                return
+
+            os.makedirs(self._path('slides'), exist_ok=True)
+            os.makedirs(self._path('media'), exist_ok=True)
+
+            # 截掉中断时写了一半的最后一行，之后追加的记录不会与其拼接成无效行
+            with open(self._path(self.JOURNAL_FILE), 'ab+') as f:
+                f.seek(0)
+                data = f.read()
+                end = data.rfind(b'\n') + 1
+                if end < len(data):
+                    logging.warning(f"截断不完整的检查点记录: {data[end:][:80]!r}")
+                    f.truncate(end)
+                    f.flush()
+                    os.fsync(f.fileno())
+
+            for line in data[:end].decode('utf-8').splitlines():
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    logging.warning(f"忽略无效的检查点记录: {line.strip()[:80]}")
+                    continue
+                self.completed[entry['group']] = entry
+
+            # 幻灯片文件编号单调递增，不会覆盖已有文件（包括日志未记录完整的组留下的文件）
+            numbers = [
+                int(name[:-len('.xml')]) for name in os.listdir(self._path('slides'))
+                if name.endswith('.xml') and name[:-len('.xml')].isdigit()
+            ]
+            numbers += [int(os.path.splitext(entry['slide'])[0]) for entry in self.completed.values()]
+            self._next_slide = max(numbers, default=0) + 1
+            logging.info(f"从检查点恢复，已完成 {len(self.completed)} 个内容组: {self.work_dir}")
+
+        except Exception as e:
+            logging.error(f"打开检查点时发生错误: {str(e)}")
+            raise
+
+    def is_completed(self, group_name: str) -> bool:
+        """
+        判断内容组是否已在检查点中完成
+
+        Args:
+            group_name: 内容组名称
+
+        Returns:
+            bool: 已完成时返回 True
+        """
+        return group_name in self.completed
+
+    def _save_part(self, part) -> str:
+        """
+        将幻灯片引用的图片或媒体部件按内容哈希保存到工作目录
+
+        Args:
+            part: 图片或媒体部件
+
+        Returns:
+            str: 媒体文件在工作目录 media 下的相对路径
+        """
+        partname = str(part.partname)
+        if partname not in self._saved_parts:
+            if isinstance(part, ImagePart):
+                # 图片以原文件名保存在哈希目录下，恢复后图片描述与直接构建一致
+                file_name = posixpath.join(part.sha1, part.desc)
+            else:
+                file_name = part.sha1 + posixpath.splitext(partname)[1]
+            path = self._path('media', *file_name.split('/'))
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            if not os.path.exists(path):
+                with open(path + '.tmp', 'wb') as f:
+                    f.write(part.blob)
+                os.replace(path + '.tmp', path)
+            self._saved_parts[partname] = file_name
+        return self._saved_parts[partname]
+
+    def _restore_part(self, package, rel: Dict):
+        """
+        从工作目录恢复图片或媒体部件，内容相同的部件在包中只保留一份
+
+        Args:
+            package: python-pptx 包对象
+            rel: 日志中记录的关系
+
+        Returns:
+            图片或媒体部件
+        """
+        file_name = rel['file']
+        if file_name not in self._restored_parts:
+            path = self._path('media', *file_name.split('/'))
+            if rel['kind'] == 'image':
+                # 按文件路径添加，图片部件保留原文件名作为描述
+                part = package.get_or_add_image_part(path)
+            else:
+                with open(path, 'rb') as f:
+                    blob = f.read()
+                part = package.get_or_add_media_part(Video.from_blob(blob, rel['content_type'], file_name))
+            self._restored_parts[file_name] = part
+        return self._restored_parts[file_name]
+
+    def record(self, group_name: str, slide):
+        """
+        记录已完成的内容组：保存幻灯片 XML 和媒体后追加日志
+
+        Args:
+            group_name: 内容组名称
+            slide: 该内容组生成的幻灯片对象
+        """
+        slide_part = slide.part
+        rels = []
+        for rId, rel in slide_part.rels.items():
+            entry = {'rId': rId, 'reltype': rel.reltype}
+            if rel.is_external:
+                entry['target_ref'] = rel.target_ref
+            elif rel.reltype == RT.SLIDE_LAYOUT:
+                entry['layout'] = str(rel.target_part.partname)
+            else:
+                target = rel.target_part
+                if not isinstance(target, (ImagePart, MediaPart)):
+                    raise ValueError(f"不支持记录的关联部件: {target.partname}")
+                entry['kind'] = 'image' if isinstance(target, ImagePart) else 'media'
+                entry['content_type'] = target.content_type
+                entry['file'] = self._save_part(target)
+            rels.append(entry)
+
+        slide_file = f"{self._next_slide:06d}.xml"
+        self._next_slide += 1
+        with open(self._path('slides', slide_file), 'wb') as f:
+            f.write(slide_part.blob)
+
+        # 日志最后写入并落盘，保证日志中的每个组在工作目录中都有完整数据
+        entry = {'group': group_name, 'slide': slide_file, 'rels': rels}
+        with open(self._path(self.JOURNAL_FILE), 'a', encoding='utf-8') as f:
+            f.write(json.dumps(entry, ensure_ascii=False) + '\n')
+            f.flush()
+            os.fsync(f.fileno())
+        self.completed[group_name] = entry
+
+    def restore(self, group_name: str, content_populator):
+        """
+        从检查点恢复内容组的幻灯片，不重新读取原始内容
+
+        Args:
+            group_name: 内容组名称
+            content_populator: 内容填充器
+
+        Returns:
+            幻灯片对象
+        """
+        entry = self.completed[group_name]
+        prs = content_populator.prs
+        if self._layout_parts is None:
+            self._layout_parts = {
+                str(layout.part.partname): layout.part
+                for master in prs.slide_masters
+                for layout in master.slide_layouts
+            }
+
+        with open(self._path('slides', entry['slide']), 'rb') as f:
+            element = parse_xml(f.read())
+        slide_part = content_populator.attach_slide_part(element)
+
+        for rel in entry['rels']:
+            if 'target_ref' in rel:
+                target = rel['target_ref']
+            elif 'layout' in rel:
+                target = self._layout_parts[rel['layout']]
+            else:
+                target = self._restore_part(prs.part.package, rel)
+            # 保持原关系ID，幻灯片 XML 中的 r:embed 等引用无需修改
+            set_relationship(slide_part, rel['rId'], rel['reltype'], target, is_external='target_ref' in rel)
+
+        logging.info(f"已从检查点恢复内容组: {group_name}")
+        return slide_part.slide
+
+    def clear(self):
+        """
+        构建成功后删除工作目录
+
+        Raises:
+            ValueError: 工作目录已存在且不是检查点目录
+        """
+        self._remove_work_dir()
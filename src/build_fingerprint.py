@@ -0,0 +1,135 @@
+from typing import Dict, Optional
+import hashlib
+import json
+import logging
+import os
+import zipfile
+from xml.etree import ElementTree
+import pptx
+from . import __version__
+
+CORE_PROPERTIES_MEMBER = 'docProps/core.xml'
+DC_IDENTIFIER = '{http://purl.org/dc/elements/1.1/}identifier'
+
+
+class BuildFingerprint:
+    """构建指纹，根据模板、规则、内容和生成器版本判断输出是否需要重新生成"""
+
+    CHUNK_SIZE = 1024 * 1024
+
+    # 只影响构建方式、不改变输出文件内容的输出规则，不计入指纹
+    BUILD_ONLY_OUTPUT_RULES = ('fast_clone', 'skip_unchanged', 'checkpoint')
+    BUILD_ONLY_SHARDING_RULES = ('workers',)
+
+    def __init__(self, template_path: str, content_dir: str, rules: Dict):
+        """
+        初始化构建指纹
+
+        Args:
+            template_path: PPT模板文件路径
+            content_dir: 资源目录路径
+            rules: 当前规则集
+        """
+        self.template_path = template_path
+        self.content_dir = content_dir
+        self.rules = rules
+        self._file_hashes = {}
+
+    def _hash_file(self, path: str) -> str:
+        """
+        分块计算文件的 SHA-256，同一文件只计算一次
+
+        Args:
+            path: 文件路径
+
+        Returns:
+            str: 十六进制摘要
+        """
+        key = os.path.abspath(path)
+        if key not in self._file_hashes:
+            digest = hashlib.sha256()
+            with open(path, 'rb') as f:
+                for chunk in iter(lambda: f.read(self.CHUNK_SIZE), b''):
+                    digest.update(chunk)
+            self._file_hashes[key] = digest.hexdigest()
+        return self._file_hashes[key]
+
+    def _fingerprint_rules(self) -> Dict:
+        """
+        获取计入指纹的规则，去掉不改变输出内容的输出规则
+
+        Returns:
+            Dict: 规则集副本
+        """
+        rules = dict(self.rules or {})
+        output_rules = {
+            key: value for key, value in (rules.get('output_rules') or {}).items()
+            if key not in self.BUILD_ONLY_OUTPUT_RULES
+        }
+        # 分片的启用状态和拆分上限决定输出文件的划分，保留；并行进程数不影响输出
+        if isinstance(output_rules.get('sharding'), dict):
+            output_rules['sharding'] = {
+                key: value for key, value in output_rules['sharding'].items()
+                if key not in self.BUILD_ONLY_SHARDING_RULES
+            }
+        rules['output_rules'] = output_rules
+        return rules
+
+    def compute(self, content_groups: Dict) -> str:
+        """
+        计算构建指纹
+
+        Args:
+            content_groups: 内容加载器扫描得到的内容组
+
+        Returns:
+            str: 十六进制指纹
+        """
+        try:
+            inputs = {
+                'generator_version': __version__,
+                'python_pptx_version': pptx.__version__,
+                'template': self._hash_file(self.template_path),
+                'rules': self._fingerprint_rules(),
+                'content': [
+                    [
+                        group_name,
+                        [
+                            [
+                                item.get('type'),
+                                os.path.relpath(item['path'], self.content_dir).replace(os.sep, '/'),
+                                self._hash_file(item['path'])
+                            ]
+                            for item in content
+                        ]
+                    ]
+                    for group_name, content in content_groups.items()
+                ]
+            }
+            payload = json.dumps(inputs, sort_keys=True, ensure_ascii=False, default=str)
+            return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+        except Exception as e:
+            logging.error(f"计算构建指纹时发生错误: {str(e)}")
+            raise
+
+    @staticmethod
+    def read(output_path: str) -> Optional[str]:
+        """
+        读取已有输出文件中记录的构建指纹（核心属性 identifier）
+
+        Args:
+            output_path: PPT文件路径
+
+        Returns:
+            Optional[str]: 指纹，文件不存在或无法读取时返回 None
+        """
+        if not os.path.isfile(output_path):
+            return None
+        try:
+            with zipfile.ZipFile(output_path) as zf:
+                core = ElementTree.fromstring(zf.read(CORE_PROPERTIES_MEMBER))
+            return core.findtext(DC_IDENTIFIER)
+        except Exception as e:
+            logging.warning(f"读取已有输出的构建指纹失败 {output_path}: {str(e)}")
+            return None
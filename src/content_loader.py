@@ -2,6 +2,7 @@ import os
 from typing import Dict, List
 import logging
 from pathlib import Path
+from PIL import Image
 
 class ContentLoader:
     """内容加载器，用于扫描和加载用户提供的资源"""
@@ -24,30 +25,31 @@ class ContentLoader:
         扫描资源目录，按规则分类内容
         
         Returns:
-            Dict: 分类后的内容组
+            Dict: 分类后的内容组（按目录和文件名排序，保证多次扫描顺序一致）
         """
         try:
-            for item in self.content_dir.iterdir():
+            for item in sorted(self.content_dir.iterdir()):
                 if item.is_dir():
                     group_content = []
                     
                     # 扫描图片
-                    for img_file in item.glob('**/*'):
+                    for img_file in sorted(item.glob('**/*')):
                         if img_file.suffix.lower() in self.SUPPORTED_IMAGE_FORMATS:
                             group_content.append({
                                 'type': 'image',
-                                'path': str(img_file)
+                                'path': str(img_file),
+                                'size': self._read_image_size(img_file)
                             })
                             
                     # 扫描文本
-                    for text_file in item.glob('**/*.txt'):
+                    for text_file in sorted(item.glob('**/*.txt')):
                         group_content.append({
                             'type': 'text',
                             'path': str(text_file)
                         })
                         
                     # 扫描视频
-                    for video_file in item.glob('**/*'):
+                    for video_file in sorted(item.glob('**/*')):
                         if video_file.suffix.lower() in self.SUPPORTED_VIDEO_FORMATS:
                             group_content.append({
                                 'type': 'video',
@@ -62,6 +64,23 @@ class ContentLoader:
             logging.error(f"扫描内容时发生错误: {str(e)}")
             raise
     
+    def _read_image_size(self, image_file: Path):
+        """
+        读取图片尺寸（仅解析文件头，不解码像素数据）
+        
+        Args:
+            image_file: 图片文件路径
+            
+        Returns:
+            Tuple: (宽, 高)，读取失败时返回 None
+        """
+        try:
+            with Image.open(image_file) as img:
+                return img.size
+        except Exception as e:
+            logging.warning(f"读取图片尺寸失败 {image_file}: {str(e)}")
+            return None
+    
     def load_text_content(self, text_file: str) -> str:
         """
         加载文本文件内容
@@ -1,29 +1,39 @@
 from pptx import Presentation
 from pptx.util import Inches
 from pptx.enum.shapes import MSO_SHAPE_TYPE
+from pptx.opc.constants import CONTENT_TYPE as CT, RELATIONSHIP_TYPE as RT
+from pptx.parts.slide import SlidePart
 from PIL import Image
 import logging
 from typing import Dict, Tuple
 import os
+from .slide_builder import SlideBuilder
+from .placeholder_types import BODY_PLACEHOLDER_TYPE, MEDIA_PLACEHOLDER_TYPE, PICTURE_PLACEHOLDER_TYPE
+from .package_writer import DeterministicPackageWriter, build_timestamp
+from .pptx_internals import next_slide_partname, slide_id_list
 
 class ContentPopulator:
     """内容填充器，负责将内容填充到PPT模板中"""
     
-    def __init__(self, template_path: str):
+    def __init__(self, template_path: str, fast_clone: bool = False):
         """
         初始化内容填充器
         
         Args:
             template_path: PPT模板文件路径
+            fast_clone: 是否使用布局骨架复制的快速构建路径（可选）
         """
         self.prs = Presentation(template_path)
+        self.slide_builder = SlideBuilder(self.prs) if fast_clone else None
+        self._layout_cache = {}
         
-    def _get_layout_by_name(self, layout_name: str):
+    def _get_layout_by_name(self, layout_name: str, layout_index: int = None):
         """
         根据名称获取幻灯片布局
         
         Args:
             layout_name: 布局名称
+            layout_index: 布局在母版中的序号（可选），指定时优先使用，用于区分同名布局
             
         Returns:
             布局对象或 None
@@ -44,12 +54,15 @@ class ContentPopulator:
                 ph_type = ph.placeholder_format.type
                 logging.info(f"       - ID: {ph.placeholder_format.idx}, Type: {ph_type}, Name: {ph.name}")
         
-        # 在母版中查找指定布局
+        # 在母版中查找指定布局，同名布局取第一个
         layout = None
-        for slide_layout in main_master.slide_layouts:
-            if slide_layout.name == layout_name:
-                layout = slide_layout
-                break
+        if layout_index is not None and 0 <= layout_index < len(main_master.slide_layouts):
+            layout = main_master.slide_layouts[layout_index]
+        else:
+            for slide_layout in main_master.slide_layouts:
+                if slide_layout.name == layout_name:
+                    layout = slide_layout
+                    break
         
         if not layout:
             # 如果找不到指定布局，使用第一个可用的布局
@@ -69,20 +82,30 @@ class ContentPopulator:
         
         return layout
     
-    def add_slide(self, layout_name: str, title: str = None) -> Tuple:
+    def add_slide(self, layout_name: str, title: str = None, layout_index: int = None) -> Tuple:
         """
         添加新的幻灯片
         
         Args:
             layout_name: 布局名称
             title: 幻灯片标题（可选）
+            layout_index: 布局在母版中的序号（可选），指定时优先于布局名称
             
         Returns:
             Tuple: (幻灯片对象, 布局对象)
         """
         try:
+            # 快速路径：布局只查找一次，之后直接复制布局骨架
+            if self.slide_builder:
+                cache_key = (layout_name, layout_index)
+                layout = self._layout_cache.get(cache_key)
+                if layout is None:
+                    layout = self._get_layout_by_name(layout_name, layout_index)
+                    self._layout_cache[cache_key] = layout
+                return self.slide_builder.add_slide(layout, title), layout
+            
             # 获取布局
-            layout = self._get_layout_by_name(layout_name)
+            layout = self._get_layout_by_name(layout_name, layout_index)
             if not layout:
                 raise ValueError(f"找不到布局: {layout_name}")
             
@@ -99,7 +122,29 @@ class ContentPopulator:
             logging.error(f"添加幻灯片时发生错误: {str(e)}")
             raise
     
-    def fill_image(self, slide, placeholder_idx: int, image_path: str):
+    def attach_slide_part(self, element):
+        """
+        以给定的幻灯片元素在末尾追加幻灯片部件（用于从检查点恢复幻灯片）
+        
+        Args:
+            element: 幻灯片根元素（p:sld）
+            
+        Returns:
+            SlidePart: 新的幻灯片部件，尚未建立到布局和媒体的关系
+        """
+        if self.slide_builder:
+            return self.slide_builder.attach_slide_part(element)
+        
+        # 与 prs.slides.add_slide 相同，先将已有幻灯片部件按顺序重命名，再生成新部件名
+        prs_part = self.prs.part
+        sldIdLst = slide_id_list(self.prs)
+        prs_part.rename_slide_parts([sldId.rId for sldId in sldIdLst.sldId_lst])
+        slide_part = SlidePart(next_slide_partname(self.prs), CT.PML_SLIDE, prs_part.package, element)
+        rId = prs_part.relate_to(slide_part, RT.SLIDE)
+        sldIdLst.add_sldId(rId)
+        return slide_part
+    
+    def fill_image(self, slide, placeholder_idx: int, image_path: str, image_size: Tuple = None):
         """
         填充图片到占位符
         
@@ -107,7 +152,11 @@ class ContentPopulator:
             slide: 幻灯片对象
             placeholder_idx: 占位符索引
             image_path: 图片路径
+            image_size: 扫描时记录的图片尺寸 (宽, 高)（可选，提供时不再重新打开图片）
         """
+        if self.slide_builder:
+            return self.slide_builder.fill_image(slide, placeholder_idx, image_path, image_size)
+        
         try:
             # 检查并记录可用的占位符
             content_placeholders = []
@@ -116,7 +165,7 @@ class ContentPopulator:
                 ph_type = shape.placeholder_format.type
                 ph_idx = shape.placeholder_format.idx
                 logging.info(f"发现占位符 - ID: {ph_idx}, Type: {ph_type}, Name: {shape.name}")
-                if ph_type == 18:  # 只使用 PICTURE(18) 类型的占位符
+                if ph_type == PICTURE_PLACEHOLDER_TYPE:  # 只使用 PICTURE(18) 类型的占位符
                     content_placeholders.append({
                         'idx': ph_idx,
                         'type': ph_type,
@@ -144,8 +193,11 @@ class ContentPopulator:
                 return
             
             # 获取图片尺寸
-            with Image.open(image_path) as img:
-                width, height = img.size
+            if image_size:
+                width, height = image_size
+            else:
+                with Image.open(image_path) as img:
+                    width, height = img.size
             
             # 计算缩放比例
             target_width = target_placeholder.width
@@ -193,6 +245,9 @@ class ContentPopulator:
             placeholder_idx: 占位符索引
             text_content: 文本内容
         """
+        if self.slide_builder:
+            return self.slide_builder.fill_text(slide, placeholder_idx, text_content)
+        
         try:
             # 检查并记录可用的占位符
             content_placeholders = []
@@ -201,7 +256,7 @@ class ContentPopulator:
                 ph_type = shape.placeholder_format.type
                 ph_idx = shape.placeholder_format.idx
                 logging.info(f"发现占位符 - ID: {ph_idx}, Type: {ph_type}, Name: {shape.name}")
-                if ph_type == 2:  # 只使用 BODY(2) 类型的占位符
+                if ph_type == BODY_PLACEHOLDER_TYPE:  # 只使用 BODY(2) 类型的占位符
                     content_placeholders.append({
                         'idx': ph_idx,
                         'type': ph_type,
@@ -254,7 +309,7 @@ class ContentPopulator:
                 ph_type = shape.placeholder_format.type
                 ph_idx = shape.placeholder_format.idx
                 logging.info(f"发现占位符 - ID: {ph_idx}, Type: {ph_type}, Name: {shape.name}")
-                if ph_type == 10:  # 只使用 MEDIA_CLIP(10) 类型的占位符
+                if ph_type == MEDIA_PLACEHOLDER_TYPE:  # 只使用 MEDIA_CLIP(10) 类型的占位符
                     content_placeholders.append({
                         'idx': ph_idx,
                         'type': ph_type,
@@ -338,15 +393,33 @@ class ContentPopulator:
             logging.error(f"设置标题时发生错误: {str(e)}")
             raise
     
-    def save(self, output_path: str):
+    def _normalize_core_properties(self, fingerprint: str = None):
+        """
+        规范化核心属性，使相同输入生成相同的文件
+        
+        Args:
+            fingerprint: 构建指纹（可选），记录在 identifier 属性中
+        """
+        core_properties = self.prs.core_properties
+        timestamp = build_timestamp()
+        core_properties.created = timestamp
+        core_properties.modified = timestamp
+        if core_properties.last_printed is not None:
+            core_properties.last_printed = timestamp
+        core_properties.revision = 1
+        core_properties.identifier = fingerprint or ''
+    
+    def save(self, output_path: str, fingerprint: str = None):
         """
-        保存PPT文件
+        以可复现的方式保存PPT文件
         
         Args:
             output_path: 输出文件路径
+            fingerprint: 构建指纹（可选）
         """
         try:
-            self.prs.save(output_path)
+            self._normalize_core_properties(fingerprint)
+            DeterministicPackageWriter.save(self.prs, output_path)
         except Exception as e:
             logging.error(f"保存PPT时发生错误: {str(e)}")
             raise
@@ -0,0 +1,259 @@
+from typing import Dict, List, Optional, Tuple
+import logging
+import numpy as np
+from .placeholder_types import BODY_PLACEHOLDER_TYPE, PICTURE_PLACEHOLDER_TYPE
+
+
+def linear_sum_assignment(cost: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    求解最小代价的最优指派（匈牙利算法，支持非方阵）
+
+    Args:
+        cost: 代价矩阵，形状为 (行数, 列数)
+
+    Returns:
+        Tuple: (行索引数组, 列索引数组)，按行索引升序排列
+    """
+    cost = np.asarray(cost, dtype=float)
+    if cost.size == 0:
+        return np.zeros(0, dtype=int), np.zeros(0, dtype=int)
+
+    # 算法要求行数不超过列数，必要时转置求解
+    transposed = cost.shape[0] > cost.shape[1]
+    if transposed:
+        cost = cost.T
+    n, m = cost.shape
+
+    # 势能与匹配状态均使用 1 起始的下标，0 号列为虚拟列
+    u = np.zeros(n + 1)
+    v = np.zeros(m + 1)
+    p = np.zeros(m + 1, dtype=int)    # p[j]: 分配给第 j 列的行
+    way = np.zeros(m + 1, dtype=int)  # 增广路径上的前驱列
+
+    for i in range(1, n + 1):
+        p[0] = i
+        j0 = 0
+        minv = np.full(m + 1, np.inf)
+        used = np.zeros(m + 1, dtype=bool)
+        while True:
+            used[j0] = True
+            i0 = p[j0]
+            free = ~used[1:]
+
+            # 向量化更新所有未使用列的最小松弛量
+            cur = cost[i0 - 1] - u[i0] - v[1:]
+            better = free & (cur < minv[1:])
+            minv[1:][better] = cur[better]
+            way[1:][better] = j0
+
+            masked = np.where(free, minv[1:], np.inf)
+            j1 = int(np.argmin(masked)) + 1
+            delta = masked[j1 - 1]
+
+            u[p[used]] += delta
+            v[used] -= delta
+            minv[1:][free] -= delta
+
+            j0 = j1
+            if p[j0] == 0:
+                break
+
+        # 沿增广路径翻转匹配
+        while j0:
+            j1 = way[j0]
+            p[j0] = p[j1]
+            j0 = j1
+
+    cols = np.nonzero(p[1:])[0]
+    rows = p[1:][cols] - 1
+    if transposed:
+        rows, cols = cols, rows
+    order = np.argsort(rows)
+    return rows[order], cols[order]
+
+
+class LayoutOptimizer:
+    """布局优化器，根据图片宽高比选择布局并优化图片到占位符的分配"""
+
+    def __init__(self, layouts_info: Dict, rules: Dict = None):
+        """
+        初始化布局优化器
+
+        Args:
+            layouts_info: 模板解析器输出的布局和占位符信息，以布局序号为键
+            rules: 规则集（可选），读取其中的 optimizer_rules
+        """
+        self.rules = (rules or {}).get('optimizer_rules', {}) or {}
+        self.layout_indices = list(layouts_info.keys())
+
+        # 与内容填充器按名称查找布局一致：同名布局取第一个
+        self._name_to_index = {}
+        for layout_index, info in layouts_info.items():
+            self._name_to_index.setdefault(info['name'], layout_index)
+
+        # 预先计算每个布局的图片占位符宽高比与面积，避免逐组重复计算
+        self._layout_stats = {}
+        for layout_index, info in layouts_info.items():
+            pictures = [
+                ph for ph in info['placeholders']
+                if ph['type'] == PICTURE_PLACEHOLDER_TYPE
+            ]
+            sizes = np.array(
+                [ph['size'] for ph in pictures], dtype=float
+            ).reshape(-1, 2)
+            valid = (sizes[:, 0] > 0) & (sizes[:, 1] > 0)
+            aspects = np.where(valid, sizes[:, 0] / np.where(valid, sizes[:, 1], 1), 1.0)
+            body_count = sum(
+                1 for ph in info['placeholders']
+                if ph['type'] == BODY_PLACEHOLDER_TYPE
+            )
+            # 幻灯片以组名作为标题，没有标题占位符（ID=0）的布局会丢失标题
+            has_title = any(ph['idx'] == 0 for ph in info['placeholders'])
+            self._layout_stats[layout_index] = {
+                'has_title': has_title,
+                'aspects': aspects,
+                'areas': sizes[:, 0] * sizes[:, 1],
+                'body_count': body_count
+            }
+
+    @property
+    def enabled(self) -> bool:
+        """是否启用布局优化"""
+        return bool(self.rules.get('enabled', True))
+
+    @staticmethod
+    def _image_aspects(images: List[Dict]) -> np.ndarray:
+        """
+        获取图片宽高比，未知尺寸记为 NaN
+
+        Args:
+            images: 图片内容项列表，每项可包含扫描时记录的 size
+
+        Returns:
+            np.ndarray: 图片宽高比数组
+        """
+        aspects = np.full(len(images), np.nan)
+        for k, item in enumerate(images):
+            size = item.get('size')
+            if size and size[0] > 0 and size[1] > 0:
+                aspects[k] = size[0] / size[1]
+        return aspects
+
+    def _score_matrix(self, image_aspects: np.ndarray, layout_index: int) -> np.ndarray:
+        """
+        计算图片在各占位符中等比缩放后实际填充的面积
+
+        Args:
+            image_aspects: 图片宽高比数组
+            layout_index: 布局序号
+
+        Returns:
+            np.ndarray: 形状为 (图片数, 占位符数) 的填充面积矩阵
+        """
+        stats = self._layout_stats[layout_index]
+        ratio = image_aspects[:, None] / stats['aspects'][None, :]
+        fill = np.minimum(ratio, 1.0 / ratio)
+        # 尺寸未知的图片按完全填充估算，不影响其他图片的分配
+        fill = np.where(np.isnan(fill), 1.0, fill)
+        return fill * stats['areas'][None, :]
+
+    def _assign(self, image_aspects: np.ndarray, layout_index: int) -> Tuple[List[Optional[int]], float]:
+        """
+        在指定布局中求解使总填充面积最大的图片分配
+
+        Args:
+            image_aspects: 图片宽高比数组
+            layout_index: 布局序号
+
+        Returns:
+            Tuple: (每张图片对应的图片占位符序号，未分配为 None, 总填充面积)
+        """
+        slots: List[Optional[int]] = [None] * len(image_aspects)
+        if len(image_aspects) == 0 or len(self._layout_stats[layout_index]['areas']) == 0:
+            return slots, 0.0
+
+        scores = self._score_matrix(image_aspects, layout_index)
+        rows, cols = linear_sum_assignment(-scores)
+        for row, col in zip(rows, cols):
+            slots[row] = int(col)
+        return slots, float(scores[rows, cols].sum())
+
+    def layout_index(self, layout_name: str) -> Optional[int]:
+        """
+        按名称查找布局序号，与内容填充器一致：同名布局取第一个，找不到时回退到第一个布局
+
+        Args:
+            layout_name: 布局名称
+
+        Returns:
+            Optional[int]: 布局序号，模板中没有布局时返回 None
+        """
+        if layout_name in self._name_to_index:
+            return self._name_to_index[layout_name]
+        return self.layout_indices[0] if self.layout_indices else None
+
+    def assign_images(self, layout_index: int, images: List[Dict]) -> List[Optional[int]]:
+        """
+        在指定布局中将图片分配到图片占位符，使总填充面积最大
+
+        Args:
+            layout_index: 布局序号
+            images: 图片内容项列表
+
+        Returns:
+            List: 每张图片对应的图片占位符序号，未分配为 None
+        """
+        if layout_index not in self._layout_stats:
+            return [None] * len(images)
+        slots, _ = self._assign(self._image_aspects(images), layout_index)
+        return slots
+
+    def optimize(self, content_list: List[Dict], preferred_layout: str = None) -> Tuple[Optional[int], List[Optional[int]]]:
+        """
+        为内容组选择最佳布局并给出图片分配方案
+
+        评分优先级依次为：是否有标题占位符、可放置的图片和文本数量、
+        空余图片占位符数量（越少越好）、图片实际填充面积，得分相同时优先使用规则引擎选定的布局。
+
+        Args:
+            content_list: 内容项列表，每项包含 type、path，图片可包含 size
+            preferred_layout: 规则引擎选定的布局名称（可选）
+
+        Returns:
+            Tuple: (布局序号, 每张图片对应的图片占位符序号)
+        """
+        try:
+            images = [item for item in content_list if item.get('type') == 'image']
+            text_count = sum(1 for item in content_list if item.get('type') == 'text')
+            has_video = any(item.get('type') == 'video' for item in content_list)
+
+            preferred_index = self.layout_index(preferred_layout)
+
+            # 视频组及仅优化分配的模式下保持规则引擎选定的布局
+            if has_video or self.rules.get('candidate_layouts', 'all') != 'all':
+                candidates = [preferred_index] if preferred_index is not None else []
+            else:
+                candidates = self.layout_indices
+
+            if not images or not candidates:
+                return preferred_index, [None] * len(images)
+
+            image_aspects = self._image_aspects(images)
+            best = None
+            for layout_index in candidates:
+                stats = self._layout_stats[layout_index]
+                slots, area = self._assign(image_aspects, layout_index)
+                placed_images = sum(1 for slot in slots if slot is not None)
+                placed = placed_images + min(text_count, stats['body_count'])
+                score = (stats['has_title'], placed, -(len(stats['areas']) - placed_images), area)
+                key = (score, layout_index == preferred_index)
+                if best is None or key > best[0]:
+                    best = (key, layout_index, slots)
+
+            _, layout_index, slots = best
+            logging.info(f"布局优化结果: 第 {layout_index} 个布局，图片分配: {slots}")
+            return layout_index, slots
+
+        except Exception as e:
+            logging.error(f"优化布局时发生错误: {str(e)}")
+            raise
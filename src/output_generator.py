@@ -1,9 +1,39 @@
+import json
 import logging
-from typing import Dict, List
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional, Tuple
 from .template_parser import TemplateParser
 from .content_loader import ContentLoader
 from .rule_engine import RuleEngine
 from .content_populator import ContentPopulator
+from .layout_optimizer import LayoutOptimizer
+from .shard_planner import ShardPlanner
+from .build_fingerprint import BuildFingerprint
+from .build_checkpoint import BuildCheckpoint
+
+
+def _build_shard(template_path: str, content_dir: str, rules_config: str, slides: List[Dict], output_path: str,
+                 fingerprint: str = None, checkpoint_dir: str = None, incomplete: bool = False) -> int:
+    """
+    在工作进程中构建并保存单个分片
+    
+    Args:
+        template_path: PPT模板文件路径
+        content_dir: 资源目录路径
+        rules_config: 规则配置文件路径
+        slides: 该分片的幻灯片计划
+        output_path: 分片输出文件路径
+        fingerprint: 构建指纹（可选）
+        checkpoint_dir: 该分片的检查点工作目录（可选）
+        incomplete: 规划阶段是否已有内容组失败（可选），为 True 时不记录指纹
+        
+    Returns:
+        int: 处理失败的内容组数量
+    """
+    generator = OutputGenerator(template_path, content_dir, rules_config)
+    return generator._build_output(slides, output_path, fingerprint, checkpoint_dir, incomplete)
+
 
 class OutputGenerator:
     """输出生成器，协调各个模块完成PPT生成"""
@@ -17,13 +47,28 @@ class OutputGenerator:
             content_dir: 资源目录路径
             rules_config: 规则配置文件路径（可选）
         """
+        self.template_path = template_path
+        self.content_dir = content_dir
+        self.rules_config = rules_config
         self.template_parser = TemplateParser(template_path)
         self.content_loader = ContentLoader(content_dir)
         self.rule_engine = RuleEngine(rules_config)
-        self.content_populator = ContentPopulator(template_path)
+        self.output_rules = self.rule_engine.get_rules().get('output_rules', {}) or {}
+        self.content_populator = ContentPopulator(
+            template_path,
+            fast_clone=self.output_rules.get('fast_clone', False)
+        )
+        self.layout_optimizer = None
+        
+    def _process_content(self, slide, content_list, image_slots=None):
+        """
+        处理内容列表
         
-    def _process_content(self, slide, content_list):
-        """处理内容列表"""
+        Args:
+            slide: 幻灯片对象
+            content_list: 内容项列表
+            image_slots: 每张图片对应的图片占位符序号（可选，默认按文件顺序填充）
+        """
         image_idx = 0
         text_idx = 0
         video_idx = 0
@@ -33,7 +78,11 @@ class OutputGenerator:
             content_path = content.get('path')
             
             if content_type == 'image':
-                self.content_populator.fill_image(slide, image_idx, content_path)
+                slot = image_slots[image_idx] if image_slots else image_idx
+                if slot is None:
+                    logging.warning(f"图片没有可分配的占位符，跳过插入: {content_path}")
+                else:
+                    self.content_populator.fill_image(slide, slot, content_path, content.get('size'))
                 image_idx += 1
             elif content_type == 'text':
                 # 读取文本文件内容
@@ -50,43 +99,369 @@ class OutputGenerator:
             else:
                 logging.warning(f"未知的内容类型: {content_type}")
                 
+    def _plan_slides(self, content_groups: Dict) -> Tuple[List[Dict], int]:
+        """
+        为每个内容组选择布局，生成幻灯片计划
+        
+        Args:
+            content_groups: 内容组
+            
+        Returns:
+            Tuple: (幻灯片计划列表, 规划失败的内容组数量)，计划每项包含 group、layout、layout_index、content 和 image_slots
+        """
+        # 获取布局规则
+        layout_rules = self.rule_engine.get_rules()
+        
+        # 解析模板占位符，用于按图片宽高比优化布局
+        layouts_info = self.template_parser.parse()
+        self.layout_optimizer = LayoutOptimizer(layouts_info, layout_rules)
+        
+        plan = []
+        failures = 0
+        for group_name, content in content_groups.items():
+            try:
+                logging.info(f"\n开始规划内容组: {group_name}")
+                
+                # 根据内容类型和数量选择布局
+                layout_name = self.rule_engine.select_layout(content)
+                logging.info(f"选择布局: {layout_name}")
+                
+                # 根据图片宽高比优化布局及图片分配
+                # 优化器按布局序号选择布局，模板中存在同名布局时也能定位到所选的那一个
+                layout_index = None
+                image_slots = None
+                if self.layout_optimizer.enabled:
+                    layout_index, image_slots = self.layout_optimizer.optimize(content, layout_name)
+                    if layout_index is not None:
+                        layout_name = layouts_info[layout_index]['name']
+                
+                plan.append({
+                    'group': group_name,
+                    'layout': layout_name,
+                    'layout_index': layout_index,
+                    'content': content,
+                    'image_slots': image_slots
+                })
+                
+            except Exception as e:
+                logging.error(f"规划内容组 {group_name} 时发生错误: {str(e)}")
+                failures += 1
+                continue
+        
+        return plan, failures
+    
+    def _render_plan(self, plan: List[Dict], checkpoint: BuildCheckpoint = None) -> int:
+        """
+        按幻灯片计划创建幻灯片并填充内容
+        
+        Args:
+            plan: 幻灯片计划列表
+            checkpoint: 构建检查点（可选），已完成的组直接恢复，新完成的组写入检查点
+            
+        Returns:
+            int: 处理失败的内容组数量
+        """
+        failures = 0
+        for slide_plan in plan:
+            group_name = slide_plan['group']
+            try:
+                # 检查点中已完成的组直接恢复
+                if checkpoint and checkpoint.is_completed(group_name):
+                    checkpoint.restore(group_name, self.content_populator)
+                    continue
+                
+                logging.info(f"\n开始处理内容组: {group_name}")
+                
+                # 创建新幻灯片，使用组名作为标题
+                slide, layout = self.content_populator.add_slide(
+                    slide_plan['layout'], title=group_name, layout_index=slide_plan.get('layout_index')
+                )
+                
+                # 处理内容
+                self._process_content(slide, slide_plan['content'], slide_plan['image_slots'])
+                
+                # 记录到检查点，失败时只影响中断后的恢复
+                if checkpoint:
+                    try:
+                        checkpoint.record(group_name, slide)
+                    except Exception as e:
+                        logging.warning(f"记录内容组 {group_name} 的检查点失败: {str(e)}")
+                
+            except Exception as e:
+                logging.error(f"处理内容组 {group_name} 时发生错误: {str(e)}")
+                failures += 1
+                continue
+        
+        return failures
+    
+    def _build_output(self, plan: List[Dict], output_path: str, fingerprint: str = None,
+                      checkpoint_dir: str = None, incomplete: bool = False) -> int:
+        """
+        按幻灯片计划构建并保存一个输出文件（单文件输出或单个分片）
+        
+        Args:
+            plan: 幻灯片计划列表
+            output_path: 输出文件路径
+            fingerprint: 构建指纹（可选）
+            checkpoint_dir: 检查点工作目录（可选），从上次中断处继续
+            incomplete: 规划阶段是否已有内容组失败（可选），为 True 时不记录指纹
+            
+        Returns:
+            int: 处理失败的内容组数量
+        """
+        # 打开检查点，从上次中断处继续
+        checkpoint = None
+        if checkpoint_dir:
+            checkpoint = BuildCheckpoint(checkpoint_dir, fingerprint)
+            checkpoint.open()
+        
+        # 处理每个内容组
+        failures = self._render_plan(plan, checkpoint)
+        
+        # 保存文件，有内容组失败时不记录指纹，下次构建不会跳过
+        self.content_populator.save(output_path, None if failures or incomplete else fingerprint)
+        logging.info(f"PPT文件已保存: {output_path}")
+        return failures
+    
+    def _shard_manifest_path(self, output_path: str) -> str:
+        """
+        获取分片索引清单路径
+        
+        Args:
+            output_path: 输出文件路径
+            
+        Returns:
+            str: 索引清单路径
+        """
+        base, _ = os.path.splitext(output_path)
+        return f"{base}_index.json"
+    
+    def _read_shard_manifest(self, output_path: str) -> Optional[Dict]:
+        """
+        读取上次构建写入的分片索引清单
+        
+        Args:
+            output_path: 输出文件路径
+            
+        Returns:
+            Optional[Dict]: 索引清单，不存在或无法读取时返回 None
+        """
+        try:
+            with open(self._shard_manifest_path(output_path), 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+    
+    def _manifest_shard_paths(self, output_path: str, manifest: Dict) -> List[str]:
+        """
+        获取索引清单中记录的分片文件路径
+        
+        Args:
+            output_path: 输出文件路径
+            manifest: 分片索引清单
+            
+        Returns:
+            List[str]: 分片文件路径列表
+        """
+        output_dir = os.path.dirname(output_path)
+        return [
+            os.path.join(output_dir, os.path.basename(shard['file']))
+            for shard in (manifest or {}).get('shards', [])
+            if shard.get('file')
+        ]
+    
+    def _is_up_to_date(self, output_path: str, fingerprint: str, sharded: bool) -> bool:
+        """
+        判断已有输出是否与当前构建指纹一致
+        
+        Args:
+            output_path: 输出文件路径
+            fingerprint: 当前构建指纹
+            sharded: 是否为分片输出
+            
+        Returns:
+            bool: 一致时返回 True
+        """
+        if not sharded:
+            return BuildFingerprint.read(output_path) == fingerprint
+        
+        manifest = self._read_shard_manifest(output_path)
+        if manifest is None or manifest.get('fingerprint') != fingerprint:
+            return False
+        return all(
+            BuildFingerprint.read(shard_path) == fingerprint
+            for shard_path in self._manifest_shard_paths(output_path, manifest)
+        )
+    
+    def _remove_stale_shards(self, output_path: str, shard_paths: List[str]):
+        """
+        删除上次索引清单中记录、但本次构建不再生成的分片文件及其检查点
+        
+        Args:
+            output_path: 输出文件路径
+            shard_paths: 本次构建的分片文件路径列表
+        """
+        previous = self._read_shard_manifest(output_path)
+        current = {os.path.basename(shard_path) for shard_path in shard_paths}
+        for stale_path in self._manifest_shard_paths(output_path, previous):
+            if os.path.basename(stale_path) in current:
+                continue
+            if os.path.isfile(stale_path):
+                os.remove(stale_path)
+                logging.info(f"已删除过期的分片文件: {stale_path}")
+            self._clear_checkpoint(stale_path)
+    
+    def _checkpoint_dir(self, output_path: str) -> str:
+        """
+        获取检查点工作目录，未启用检查点时返回 None
+        
+        Args:
+            output_path: 输出文件路径
+            
+        Returns:
+            str: 检查点工作目录
+        """
+        checkpoint_rules = self.output_rules.get('checkpoint', {}) or {}
+        if not checkpoint_rules.get('enabled', False):
+            return None
+        # 检查点始终使用以输出文件名命名的专用目录，清理时不会波及其他文件
+        base, _ = os.path.splitext(output_path)
+        work_dir = checkpoint_rules.get('work_dir')
+        if work_dir:
+            return os.path.join(work_dir, f"{os.path.basename(base)}.checkpoint")
+        return f"{base}.checkpoint"
+    
+    def _clear_checkpoint(self, output_path: str):
+        """
+        删除输出文件对应的检查点工作目录（未启用检查点时不做任何操作）
+        
+        Args:
+            output_path: 输出文件路径
+        """
+        work_dir = self._checkpoint_dir(output_path)
+        if work_dir:
+            BuildCheckpoint(work_dir, None).clear()
+    
+    def _generate_shards(self, plan: List[Dict], output_path: str, sharding_rules: Dict,
+                         fingerprint: str = None, incomplete: bool = False) -> Tuple[int, List[str]]:
+        """
+        将幻灯片计划拆分为多个分片，并行构建保存，并写入索引清单
+        
+        Args:
+            plan: 幻灯片计划列表
+            output_path: 输出文件路径，分片文件名在其基础上追加序号
+            sharding_rules: 分片规则
+            fingerprint: 构建指纹（可选）
+            incomplete: 规划阶段是否已有内容组失败（可选），为 True 时不记录指纹
+            
+        Returns:
+            Tuple: (处理失败的内容组数量, 分片文件路径列表)
+        """
+        # 模板自带的幻灯片和媒体会重复出现在每个分片中
+        template_slides, template_media_bytes = ShardPlanner.template_footprint(self.template_path)
+        shards = ShardPlanner(sharding_rules, template_slides, template_media_bytes).split(plan)
+        base, ext = os.path.splitext(output_path)
+        shard_paths = [f"{base}_{index:03d}{ext}" for index in range(1, len(shards) + 1)]
+        checkpoint_dirs = [self._checkpoint_dir(shard_path) for shard_path in shard_paths]
+        
+        workers = sharding_rules.get('workers') or os.cpu_count() or 1
+        workers = max(1, min(workers, len(shards)))
+        logging.info(f"使用 {workers} 个工作进程构建 {len(shards)} 个分片")
+        
+        if workers == 1:
+            failures = sum(
+                _build_shard(
+                    self.template_path, self.content_dir, self.rules_config,
+                    shard['slides'], shard_path, fingerprint, checkpoint_dir, incomplete
+                )
+                for shard, shard_path, checkpoint_dir in zip(shards, shard_paths, checkpoint_dirs)
+            )
+        else:
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                futures = [
+                    executor.submit(
+                        _build_shard, self.template_path, self.content_dir,
+                        self.rules_config, shard['slides'], shard_path, fingerprint, checkpoint_dir, incomplete
+                    )
+                    for shard, shard_path, checkpoint_dir in zip(shards, shard_paths, checkpoint_dirs)
+                ]
+                failures = sum(future.result() for future in futures)
+        
+        # 删除上次构建遗留、本次不再生成的分片，再写入新的索引清单
+        self._remove_stale_shards(output_path, shard_paths)
+        manifest_path = self._shard_manifest_path(output_path)
+        
+        # 写入索引清单，记录每个内容组所在的分片文件
+        # 有内容组失败时不记录指纹，下次构建会重新生成
+        manifest = {
+            'fingerprint': None if failures or incomplete else fingerprint,
+            'shards': [
+                {
+                    'file': os.path.basename(shard_path),
+                    'groups': shard['groups'],
+                    'slide_count': shard['slide_count'],
+                    'media_bytes': shard['media_bytes']
+                }
+                for shard, shard_path in zip(shards, shard_paths)
+            ]
+        }
+        with open(manifest_path, 'w', encoding='utf-8') as f:
+            json.dump(manifest, f, ensure_ascii=False, indent=2)
+        logging.info(f"分片索引已保存: {manifest_path}")
+        
+        return failures, shard_paths
+    
     def generate(self, output_path: str):
         """
         生成PPT文件
         
         Args:
-            output_path: 输出文件路径
+            output_path: 输出文件路径；启用分片时作为分片文件名的基础
         """
         try:
             # 扫描内容
             content_groups = self.content_loader.scan_content()
             logging.info(f"找到 {len(content_groups)} 个内容组")
             
-            # 获取布局规则
-            layout_rules = self.rule_engine.get_rules()
+            sharding_rules = self.output_rules.get('sharding', {}) or {}
+            sharded = sharding_rules.get('enabled', False)
             
-            # 处理每个内容组
-            for group_name, content in content_groups.items():
-                try:
-                    logging.info(f"\n开始处理内容组: {group_name}")
-                    
-                    # 根据内容类型和数量选择布局
-                    layout_name = self.rule_engine.select_layout(content)
-                    logging.info(f"选择布局: {layout_name}")
-                    
-                    # 创建新幻灯片，使用组名作为标题
-                    slide, layout = self.content_populator.add_slide(layout_name, title=group_name)
-                    
-                    # 处理内容
-                    self._process_content(slide, content)
-                    
-                except Exception as e:
-                    logging.error(f"处理内容组 {group_name} 时发生错误: {str(e)}")
-                    continue
-                
-            # 保存文件
-            self.content_populator.save(output_path)
-            logging.info(f"PPT文件已保存: {output_path}")
+            # 渲染前计算构建指纹，输入未变化时跳过构建和写入
+            fingerprint = BuildFingerprint(
+                self.template_path, self.content_dir, self.rule_engine.get_rules()
+            ).compute(content_groups)
+            if self.output_rules.get('skip_unchanged', True) and self._is_up_to_date(output_path, fingerprint, sharded):
+                logging.info(f"输入未变化（指纹 {fingerprint[:12]}），跳过生成: {output_path}")
+                if sharded:
+                    for shard_path in self._manifest_shard_paths(output_path, self._read_shard_manifest(output_path)):
+                        self._clear_checkpoint(shard_path)
+                else:
+                    self._clear_checkpoint(output_path)
+                return
+            
+            # 规划每个内容组的幻灯片
+            # 规划失败的组与渲染失败一样计入失败数，输出不记录指纹
+            plan, failures = self._plan_slides(content_groups)
+            incomplete = failures > 0
+            
+            # 分片模式拆分为多个文件并行生成，否则作为单个分片生成
+            if sharded:
+                render_failures, output_paths = self._generate_shards(
+                    plan, output_path, sharding_rules, fingerprint, incomplete
+                )
+            else:
+                render_failures = self._build_output(
+                    plan, output_path, fingerprint, self._checkpoint_dir(output_path), incomplete
+                )
+                output_paths = [output_path]
+            failures += render_failures
+            
+            # 全部内容组成功后清理检查点，否则保留以便下次只重试失败的组
+            if failures:
+                logging.warning(f"{failures} 个内容组处理失败，输出未记录构建指纹")
+            else:
+                for path in output_paths:
+                    self._clear_checkpoint(path)
             
         except Exception as e:
             logging.error(f"生成PPT时发生错误: {str(e)}")
@@ -0,0 +1,52 @@
+from datetime import datetime, timezone
+import os
+import zipfile
+from .pptx_internals import write_package
+
+# zip 格式支持的最早时间，未设置 SOURCE_DATE_EPOCH 时作为固定时间戳
+DEFAULT_BUILD_TIMESTAMP = datetime(1980, 1, 1)
+
+
+def build_timestamp() -> datetime:
+    """
+    获取可复现构建使用的固定时间戳（UTC）
+
+    优先使用 SOURCE_DATE_EPOCH 环境变量，否则使用 1980-01-01 00:00:00。
+
+    Returns:
+        datetime: 不含时区信息的 UTC 时间
+    """
+    epoch = os.environ.get('SOURCE_DATE_EPOCH')
+    if epoch:
+        timestamp = datetime.fromtimestamp(int(epoch), tz=timezone.utc).replace(tzinfo=None)
+        return max(timestamp, DEFAULT_BUILD_TIMESTAMP)
+    return DEFAULT_BUILD_TIMESTAMP
+
+
+class DeterministicPackageWriter:
+    """可复现的 PPTX 包写入器：部件按名称排序，zip 元数据固定"""
+
+    def __init__(self, date_time: datetime):
+        self._date_time = date_time.timetuple()[:6]
+
+    def _zipinfo(self, membername: str) -> zipfile.ZipInfo:
+        """以固定的时间戳、权限和来源系统生成 zip 成员信息"""
+        info = zipfile.ZipInfo(membername, date_time=self._date_time)
+        info.compress_type = zipfile.ZIP_DEFLATED
+        info.create_system = 3
+        info.external_attr = 0o600 << 16
+        return info
+
+    @classmethod
+    def save(cls, prs, pkg_file, date_time: datetime = None):
+        """
+        以可复现的方式保存演示文稿
+
+        Args:
+            prs: python-pptx 演示文稿对象
+            pkg_file: 输出文件路径或文件对象
+            date_time: zip 成员时间戳（可选，默认使用 build_timestamp()）
+        """
+        package = prs.part.package
+        parts = sorted(package.iter_parts(), key=lambda part: str(part.partname))
+        write_package(package, pkg_file, parts, cls(date_time or build_timestamp())._zipinfo)
@@ -0,0 +1,5 @@
+# 内容填充使用的占位符类型编号（PP_PLACEHOLDER 枚举值）
+# 布局优化器、内容填充器和幻灯片构建器共用，保证各处图片、文本、媒体槽位的编号一致
+PICTURE_PLACEHOLDER_TYPE = 18     # PICTURE
+BODY_PLACEHOLDER_TYPE = 2         # BODY
+MEDIA_PLACEHOLDER_TYPE = 10       # MEDIA_CLIP
@@ -0,0 +1,112 @@
+"""
+python-pptx 内部接口的集中封装
+
+项目中对 python-pptx 私有属性和方法的访问全部集中在本模块中，其他模块只调用这里的函数。
+requirements.txt 将 python-pptx 限定在已验证的 1.0.x 版本，升级时只需检查并调整本模块。
+"""
+from typing import Callable, Iterable
+import zipfile
+from pptx.opc.constants import RELATIONSHIP_TARGET_MODE as RTM
+from pptx.opc.package import _Relationship
+from pptx.opc.packuri import PackURI
+from pptx.opc.serialized import PackageWriter, _ZipPkgWriter
+
+
+def slide_id_list(prs):
+    """
+    获取演示文稿的幻灯片 ID 列表元素（p:sldIdLst），不存在时创建
+
+    Args:
+        prs: python-pptx 演示文稿对象
+
+    Returns:
+        幻灯片 ID 列表元素
+    """
+    return prs.part._element.get_or_add_sldIdLst()
+
+
+def next_slide_partname(prs) -> PackURI:
+    """
+    获取下一张幻灯片的部件名（与 python-pptx 添加幻灯片时的命名一致）
+
+    Args:
+        prs: python-pptx 演示文稿对象
+
+    Returns:
+        PackURI: 幻灯片部件名
+    """
+    return prs.part._next_slide_partname
+
+
+def add_slide_id(sldIdLst, slide_id: int, rId: str):
+    """
+    以指定的幻灯片 ID 追加 p:sldId，不扫描已有的幻灯片 ID
+
+    Args:
+        sldIdLst: 幻灯片 ID 列表元素
+        slide_id: 幻灯片 ID
+        rId: 演示文稿到该幻灯片的关系ID
+    """
+    sldIdLst._add_sldId(id=slide_id, rId=rId)
+
+
+def add_relationship(part, reltype: str, target) -> str:
+    """
+    为部件添加到目标部件的新关系
+
+    与 part.relate_to 不同，不会先线性查找已有的相同关系，
+    只应用于确定尚不存在该关系的情况（如新建的部件）。
+
+    Args:
+        part: 关系的源部件
+        reltype: 关系类型
+        target: 目标部件
+
+    Returns:
+        str: 新关系的关系ID
+    """
+    return part.rels._add_relationship(reltype, target)
+
+
+def set_relationship(part, rId: str, reltype: str, target, is_external: bool = False):
+    """
+    以指定的关系ID为部件添加关系，用于恢复与部件 XML 中引用一致的关系
+
+    Args:
+        part: 关系的源部件
+        rId: 关系ID
+        reltype: 关系类型
+        target: 目标部件，外部关系时为目标地址
+        is_external: 是否为外部关系
+    """
+    target_mode = RTM.EXTERNAL if is_external else RTM.INTERNAL
+    part.rels._rels[rId] = _Relationship(part.partname.baseURI, rId, reltype, target_mode, target)
+
+
+class _ZipInfoPkgWriter(_ZipPkgWriter):
+    """使用调用方提供的 ZipInfo 写入 zip 成员的包写入器"""
+
+    def __init__(self, pkg_file, zipinfo_factory: Callable[[str], zipfile.ZipInfo]):
+        super().__init__(pkg_file)
+        self._zipinfo_factory = zipinfo_factory
+
+    def write(self, pack_uri, blob: bytes):
+        """按成员名生成 ZipInfo 并写入 zip 成员"""
+        self._zipf.writestr(self._zipinfo_factory(pack_uri.membername), blob)
+
+
+def write_package(package, pkg_file, parts: Iterable, zipinfo_factory: Callable[[str], zipfile.ZipInfo]):
+    """
+    按给定的部件顺序写入物理包（.pptx 文件）
+
+    Args:
+        package: python-pptx 包对象
+        pkg_file: 输出文件路径或文件对象
+        parts: 要写入的部件，按此顺序写入
+        zipinfo_factory: 根据 zip 成员名生成 ZipInfo 的函数
+    """
+    writer = PackageWriter(pkg_file, package._rels, tuple(parts))
+    with _ZipInfoPkgWriter(pkg_file, zipinfo_factory) as phys_writer:
+        writer._write_content_types_stream(phys_writer)
+        writer._write_pkg_rels(phys_writer)
+        writer._write_parts(phys_writer)
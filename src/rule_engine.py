@@ -35,6 +35,20 @@ class RuleEngine:
             'text_rules': {
                 'single': 'layout_text',
                 'with_image': 'layout_text_image'
+            },
+            'optimizer_rules': {
+                'enabled': True,
+                'candidate_layouts': 'all'
+            },
+            'output_rules': {
+                'fast_clone': False,
+                'skip_unchanged': True,
+                'checkpoint': {
+                    'enabled': False
+                },
+                'sharding': {
+                    'enabled': False
+                }
             }
         }
     
@@ -0,0 +1,141 @@
+from typing import Dict, List, Tuple
+import logging
+import os
+from pptx import Presentation
+
+
+class ShardPlanner:
+    """分片规划器，将幻灯片计划拆分为多个大小受限的演示文稿"""
+
+    def __init__(self, sharding_rules: Dict = None, template_slides: int = 0, template_media_bytes: int = 0):
+        """
+        初始化分片规划器
+
+        Args:
+            sharding_rules: 分片规则（可选），支持 max_slides、max_bytes、
+                group_prefix 和 prefix_separator
+            template_slides: 模板中已有的幻灯片数量（可选），每个分片都会包含
+            template_media_bytes: 模板中已有的媒体字节数（可选），每个分片都会包含
+        """
+        rules = sharding_rules or {}
+        self.max_slides = rules.get('max_slides')
+        self.max_bytes = rules.get('max_bytes')
+        self.group_prefix = bool(rules.get('group_prefix', False))
+        self.prefix_separator = rules.get('prefix_separator', '_')
+        self.template_slides = template_slides
+        self.template_media_bytes = template_media_bytes
+
+    @staticmethod
+    def template_footprint(template_path: str) -> Tuple[int, int]:
+        """
+        统计模板自带的幻灯片数量和媒体字节数
+
+        Args:
+            template_path: PPT模板文件路径
+
+        Returns:
+            Tuple: (幻灯片数量, 媒体字节数)
+        """
+        prs = Presentation(template_path)
+        media_bytes = sum(
+            len(part.blob) for part in prs.part.package.iter_parts()
+            if part.partname.startswith('/ppt/media/')
+        )
+        return len(prs.slides), media_bytes
+
+    def _group_prefix(self, group_name: str) -> str:
+        """
+        获取内容组名称的前缀
+
+        Args:
+            group_name: 内容组名称
+
+        Returns:
+            str: 分隔符之前的部分，没有分隔符时为完整组名
+        """
+        return group_name.split(self.prefix_separator, 1)[0]
+
+    def _media_files(self, slide_plan: Dict) -> Dict[str, int]:
+        """
+        获取幻灯片嵌入的媒体文件及其大小
+
+        Args:
+            slide_plan: 单张幻灯片的计划
+
+        Returns:
+            Dict: 媒体文件路径到字节数的映射
+        """
+        media = {}
+        image_slots = slide_plan.get('image_slots')
+        image_idx = 0
+        for item in slide_plan['content']:
+            content_type = item.get('type')
+            if content_type == 'image':
+                slot = image_slots[image_idx] if image_slots else image_idx
+                image_idx += 1
+                # 布局优化器未分配占位符的图片不会嵌入
+                if slot is None:
+                    continue
+            elif content_type != 'video':
+                continue
+            path = os.path.abspath(item['path'])
+            try:
+                media[path] = os.path.getsize(path)
+            except OSError as e:
+                logging.warning(f"获取媒体文件大小失败 {path}: {str(e)}")
+        return media
+
+    def split(self, plan: List[Dict]) -> List[Dict]:
+        """
+        按最大幻灯片数、最大嵌入字节数或组名前缀拆分幻灯片计划
+
+        每个分片都包含模板自带的幻灯片和媒体，计入该分片的数量和字节数；
+        同一分片内重复引用的媒体文件只计算一次；单个内容组超出上限时独占一个分片。
+
+        Args:
+            plan: 幻灯片计划列表，每项包含 group、content 和 image_slots
+
+        Returns:
+            List[Dict]: 分片列表，每项包含 slides、groups、prefix、slide_count 和 media_bytes
+        """
+        shards = []
+        current = None
+
+        for slide_plan in plan:
+            media = self._media_files(slide_plan)
+            prefix = self._group_prefix(slide_plan['group']) if self.group_prefix else None
+
+            if current is not None:
+                new_bytes = sum(size for path, size in media.items() if path not in current['media'])
+                if (
+                    (self.group_prefix and prefix != current['prefix'])
+                    or (self.max_slides and current['slide_count'] >= self.max_slides)
+                    or (self.max_bytes and current['media_bytes'] + new_bytes > self.max_bytes)
+                ):
+                    current = None
+
+            if current is None:
+                current = {
+                    'slides': [],
+                    'groups': [],
+                    'prefix': prefix,
+                    'media': {},
+                    'slide_count': self.template_slides,
+                    'media_bytes': self.template_media_bytes
+                }
+                shards.append(current)
+
+            for path, size in media.items():
+                if path not in current['media']:
+                    current['media'][path] = size
+                    current['media_bytes'] += size
+            current['slides'].append(slide_plan)
+            current['slide_count'] += 1
+            if slide_plan['group'] not in current['groups']:
+                current['groups'].append(slide_plan['group'])
+
+        for shard in shards:
+            del shard['media']
+
+        logging.info(f"幻灯片计划已拆分为 {len(shards)} 个分片")
+        return shards
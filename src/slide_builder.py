@@ -0,0 +1,234 @@
+from copy import deepcopy
+from typing import Dict, Tuple
+import logging
+import os
+from pptx.opc.constants import CONTENT_TYPE as CT, RELATIONSHIP_TYPE as RT
+from pptx.opc.packuri import PackURI
+from pptx.parts.slide import SlidePart
+from .placeholder_types import BODY_PLACEHOLDER_TYPE, PICTURE_PLACEHOLDER_TYPE
+from .pptx_internals import add_relationship, add_slide_id, slide_id_list
+
+
+class SlideBuilder:
+    """幻灯片快速构建器，为每个布局预先克隆一次 XML 骨架，之后直接复制骨架生成幻灯片"""
+
+    def __init__(self, prs):
+        """
+        初始化幻灯片构建器
+
+        Args:
+            prs: python-pptx 演示文稿对象
+        """
+        self.prs = prs
+        self._skeletons = {}
+        self._image_parts = {}
+
+        # 直接维护幻灯片编号和关系，避免每次添加时扫描全部已有幻灯片
+        self._sldIdLst = slide_id_list(prs)
+        # 与 prs.slides 相同，先将模板中已有的幻灯片按顺序重命名为 slide1..N，
+        # 避免模板部件名不连续（如 slide1、slide3）时与新幻灯片的部件名冲突
+        prs.part.rename_slide_parts([sldId.rId for sldId in self._sldIdLst.sldId_lst])
+        slide_ids = [int(sldId.id) for sldId in self._sldIdLst.sldId_lst]
+        self._next_slide_id = max(slide_ids + [255]) + 1
+        self._slide_count = len(slide_ids)
+
+    def _get_skeleton(self, layout) -> Dict:
+        """
+        获取布局对应的幻灯片骨架，首次使用时构建并缓存
+
+        Args:
+            layout: 幻灯片布局对象
+
+        Returns:
+            Dict: 骨架元素及其占位符信息
+        """
+        skeleton = self._skeletons.get(layout.part.partname)
+        if skeleton is not None:
+            return skeleton
+
+        # 使用 python-pptx 的标准流程克隆一次占位符，该临时部件不会关联到演示文稿中
+        slide_part = SlidePart.new(PackURI("/ppt/slides/skeleton.xml"), self.prs.part.package, layout.part)
+        slide_part.slide.shapes.clone_layout_placeholders(layout)
+        element = slide_part._element
+
+        # 记录占位符在形状树中的位置，复制后可直接按位置定位
+        layout_placeholders = {ph.placeholder_format.idx: ph for ph in layout.placeholders}
+        title = None
+        pictures = []
+        bodies = []
+        for position, child in enumerate(element.cSld.spTree):
+            if not getattr(child, 'has_ph_elm', False):
+                continue
+            ph_idx = child.ph_idx
+            if ph_idx == 0:
+                title = position
+            if child.ph_type == PICTURE_PLACEHOLDER_TYPE:
+                layout_ph = layout_placeholders[ph_idx]
+                pictures.append({
+                    'position': position,
+                    'box': (layout_ph.left, layout_ph.top, layout_ph.width, layout_ph.height)
+                })
+            elif child.ph_type == BODY_PLACEHOLDER_TYPE:
+                bodies.append(position)
+
+        skeleton = {
+            'element': element,
+            'title': title,
+            'pictures': pictures,
+            'bodies': bodies
+        }
+        self._skeletons[layout.part.partname] = skeleton
+        logging.info(f"已为布局 {layout.name} 构建幻灯片骨架")
+        return skeleton
+
+    @staticmethod
+    def _set_text(sp, text: str):
+        """
+        直接写入占位符文本，每行一个段落
+
+        Args:
+            sp: 占位符形状元素
+            text: 文本内容
+        """
+        txBody = sp.get_or_add_txBody()
+        txBody.clear_content()
+        for p_text in text.split('\n'):
+            txBody.add_p().append_text(p_text)
+
+    def add_slide(self, layout, title: str = None):
+        """
+        复制布局骨架添加新幻灯片
+
+        Args:
+            layout: 幻灯片布局对象
+            title: 幻灯片标题（可选）
+
+        Returns:
+            幻灯片对象
+        """
+        skeleton = self._get_skeleton(layout)
+        slide_part = self.attach_slide_part(deepcopy(skeleton['element']))
+        slide_part.relate_to(layout.part, RT.SLIDE_LAYOUT)
+
+        slide = slide_part.slide
+        if title:
+            self.fill_title(slide, title)
+        return slide
+
+    def attach_slide_part(self, element):
+        """
+        以给定的幻灯片元素创建幻灯片部件并追加到演示文稿末尾
+
+        Args:
+            element: 幻灯片根元素（p:sld）
+
+        Returns:
+            SlidePart: 新的幻灯片部件，尚未建立到布局等部件的关系
+        """
+        self._slide_count += 1
+        partname = PackURI(f"/ppt/slides/slide{self._slide_count}.xml")
+        slide_part = SlidePart(partname, CT.PML_SLIDE, self.prs.part.package, element)
+        # 新建的幻灯片部件不可能已有关系，直接添加，跳过 relate_to 对全部关系的线性查找
+        rId = add_relationship(self.prs.part, RT.SLIDE, slide_part)
+        add_slide_id(self._sldIdLst, self._next_slide_id, rId)
+        self._next_slide_id += 1
+        return slide_part
+
+    def _slide_skeleton(self, slide) -> Dict:
+        """
+        获取幻灯片所使用布局的骨架信息
+
+        Args:
+            slide: 由本构建器创建的幻灯片对象
+
+        Returns:
+            Dict: 骨架元素及其占位符信息
+        """
+        return self._get_skeleton(slide.slide_layout)
+
+    def fill_title(self, slide, title: str):
+        """
+        填充幻灯片标题（ID为0的占位符）
+
+        Args:
+            slide: 幻灯片对象
+            title: 标题文本
+        """
+        position = self._slide_skeleton(slide)['title']
+        if position is None:
+            logging.warning(f"未找到标题占位符(ID=0)，无法设置标题: {title}")
+            return
+        self._set_text(slide._element.cSld.spTree[position], title)
+
+    def fill_text(self, slide, placeholder_idx: int, text_content: str):
+        """
+        填充文本到第 placeholder_idx 个 BODY 占位符
+
+        Args:
+            slide: 幻灯片对象
+            placeholder_idx: 文本占位符序号
+            text_content: 文本内容
+        """
+        bodies = self._slide_skeleton(slide)['bodies']
+        if placeholder_idx >= len(bodies):
+            logging.warning(f"文本索引 {placeholder_idx} 超出可用占位符数量 {len(bodies)}，跳过插入")
+            return
+        self._set_text(slide._element.cSld.spTree[bodies[placeholder_idx]], text_content)
+
+    def _get_image_part(self, slide_part, image_path: str) -> Tuple:
+        """
+        获取图片部件并建立幻灯片到图片的关系，同一路径的图片只读取一次
+
+        Args:
+            slide_part: 幻灯片部件
+            image_path: 图片路径
+
+        Returns:
+            Tuple: (图片部件, 关系ID)
+        """
+        key = os.path.abspath(image_path)
+        image_part = self._image_parts.get(key)
+        if image_part is None:
+            image_part = self.prs.part.package.get_or_add_image_part(image_path)
+            self._image_parts[key] = image_part
+        return image_part, slide_part.relate_to(image_part, RT.IMAGE)
+
+    def fill_image(self, slide, placeholder_idx: int, image_path: str, image_size: Tuple = None):
+        """
+        在第 placeholder_idx 个图片占位符位置等比缩放并居中插入图片
+
+        Args:
+            slide: 幻灯片对象
+            placeholder_idx: 图片占位符序号
+            image_path: 图片路径
+            image_size: 扫描时记录的图片尺寸 (宽, 高)（可选）
+        """
+        pictures = self._slide_skeleton(slide)['pictures']
+        if not pictures:
+            logging.warning(f"幻灯片上没有找到图片占位符(Type=18)，跳过图片插入")
+            return
+        if placeholder_idx >= len(pictures):
+            logging.warning(f"图片索引 {placeholder_idx} 超出可用占位符数量 {len(pictures)}，跳过插入")
+            return
+
+        picture = pictures[placeholder_idx]
+        spTree = slide._element.cSld.spTree
+        image_part, rId = self._get_image_part(slide.part, image_path)
+        if image_size:
+            width, height = image_size
+        else:
+            width, height = image_part.image.size
+
+        # 与 ContentPopulator.fill_image 相同的缩放与居中计算
+        ph_left, ph_top, target_width, target_height = picture['box']
+        scale = min(target_width / width, target_height / height)
+        scaled_width = int(width * scale)
+        scaled_height = int(height * scale)
+        left = ph_left + (target_width - scaled_width) / 2
+        top = ph_top + (target_height - scaled_height) / 2
+
+        # 清空占位符文本，并在形状树中直接追加图片元素
+        self._set_text(spTree[picture['position']], '')
+        id_ = spTree.max_shape_id + 1
+        spTree.add_pic(id_, f"Picture {id_ - 1}", image_part.desc, rId, left, top, scaled_width, scaled_height)
+        logging.debug(f"图片插入成功: {image_path}")
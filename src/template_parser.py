@@ -21,7 +21,7 @@ class TemplateParser:
         解析PPT模板，提取布局和占位符信息
         
         Returns:
-            Dict: 包含布局和占位符信息的字典
+            Dict: 以布局在母版中的序号为键的布局和占位符信息（模板中可能存在同名布局）
         """
         try:
             self.prs = Presentation(self.template_path)
@@ -34,7 +34,7 @@ class TemplateParser:
             logging.info(f"使用母版: {main_master.name}")
             
             # 解析该母版下的所有布局
-            for layout in main_master.slide_layouts:
+            for layout_index, layout in enumerate(main_master.slide_layouts):
                 placeholders = []
                 for shape in layout.placeholders:
                     placeholder_info = {
@@ -45,7 +45,8 @@ class TemplateParser:
                     }
                     placeholders.append(placeholder_info)
                 
-                self.layouts_info[layout.name] = {
+                self.layouts_info[layout_index] = {
+                    'name': layout.name,
                     'placeholders': placeholders,
                     'placeholder_count': len(placeholders)
                 }
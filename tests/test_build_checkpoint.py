@@ -0,0 +1,118 @@
+"""
+检查点断点续建的回归测试
+
+日志最后一行在中断时只写了一半、之后的构建再次中断时，恢复后的输出仍应与一次完成的构建逐字节一致。
+
+用法：
+    python -m pytest tests
+    python -m unittest discover tests
+"""
+import os
+import sys
+import tempfile
+import unittest
+from unittest import mock
+import yaml
+from pptx import Presentation
+from PIL import Image
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.build_checkpoint import BuildCheckpoint
+from src.output_generator import OutputGenerator
+
+GROUP_COUNT = 8
+
+
+class _Crash(BaseException):
+    """模拟进程被终止，不会被生成流程中的 except Exception 捕获"""
+
+
+class BuildCheckpointTornJournalTest(unittest.TestCase):
+    """日志被截断后的断点续建"""
+
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.work_dir = self._tmp.name
+        self.template_path = os.path.join(self.work_dir, 'template.pptx')
+        Presentation().save(self.template_path)
+
+        # 每个内容组包含一张图片和一段文本，部分组共用同一张图片
+        self.content_dir = os.path.join(self.work_dir, 'content')
+        for i in range(GROUP_COUNT):
+            group_dir = os.path.join(self.content_dir, f"group_{i:02d}")
+            os.makedirs(group_dir)
+            size = [(800, 600), (600, 800), (500, 500)][i % 3]
+            Image.new('RGB', size, (30 * i, 90, 150)).save(os.path.join(group_dir, 'image.png'))
+            with open(os.path.join(group_dir, 'text.txt'), 'w', encoding='utf-8') as f:
+                f.write(f"第 {i} 组\n说明文字")
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def _rules(self, fast_clone: bool) -> str:
+        """写入启用检查点、不跳过未变化输出的规则配置"""
+        rules_path = os.path.join(self.work_dir, f"rules_{fast_clone}.yaml")
+        rules = {
+            'output_rules': {
+                'fast_clone': fast_clone,
+                'skip_unchanged': False,
+                'checkpoint': {'enabled': True}
+            }
+        }
+        with open(rules_path, 'w', encoding='utf-8') as f:
+            yaml.safe_dump(rules, f)
+        return rules_path
+
+    def _generate(self, rules_path: str, output_path: str, crash_after: int = None):
+        """生成输出，crash_after 指定处理完多少个内容组后模拟中断"""
+        generator = OutputGenerator(self.template_path, self.content_dir, rules_path)
+        if crash_after is None:
+            generator.generate(output_path)
+            return
+
+        process_content = generator._process_content
+        calls = []
+
+        def crashing_process_content(*args, **kwargs):
+            if len(calls) == crash_after:
+                raise _Crash()
+            calls.append(args)
+            return process_content(*args, **kwargs)
+
+        with mock.patch.object(generator, '_process_content', crashing_process_content):
+            with self.assertRaises(_Crash):
+                generator.generate(output_path)
+
+    def test_resume_after_torn_journal(self):
+        for fast_clone in (True, False):
+            with self.subTest(fast_clone=fast_clone):
+                rules_path = self._rules(fast_clone)
+                reference_path = os.path.join(self.work_dir, f"reference_{fast_clone}.pptx")
+                output_path = os.path.join(self.work_dir, f"resumed_{fast_clone}.pptx")
+                self._generate(rules_path, reference_path)
+
+                # 第一次构建完成 3 个组后中断，并模拟第 4 条记录只写了一半
+                self._generate(rules_path, output_path, crash_after=3)
+                checkpoint_dir = os.path.splitext(output_path)[0] + '.checkpoint'
+                journal_path = os.path.join(checkpoint_dir, BuildCheckpoint.JOURNAL_FILE)
+                with open(journal_path, 'ab') as f:
+                    f.write('{"group": "group_03", "slide": "0000'.encode('utf-8'))
+
+                # 第二次构建从第 4 个组继续，再完成 3 个组后中断
+                self._generate(rules_path, output_path, crash_after=3)
+                with open(journal_path, 'rb') as f:
+                    lines = f.read().splitlines()
+                self.assertEqual(len(lines), 6)
+
+                # 第三次构建恢复已完成的组并生成其余的组
+                self._generate(rules_path, output_path)
+                with open(reference_path, 'rb') as f:
+                    expected = f.read()
+                with open(output_path, 'rb') as f:
+                    self.assertEqual(f.read(), expected)
+                self.assertFalse(os.path.exists(checkpoint_dir))
+
+
+if __name__ == '__main__':
+    unittest.main()